@@ -0,0 +1,57 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: config.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+
+from pydantic import BaseModel
+
+
+class AgentConfig(BaseModel):
+    """Configuration for an agent."""
+
+    id: str
+    role: str
+    goal: str
+    backstory: str
+    allow_delegation: bool
+    verbose: bool
+
+
+class AgentReference(BaseModel):
+    """Reference to an agent by ID."""
+
+    id: str
+
+
+class TaskConfig(BaseModel):
+    """Configuration for a task."""
+
+    description: str
+    expected_output: str
+    tools: list[str]
+    agent: AgentReference
+
+
+class CrewSettings(BaseModel):
+    """Settings for the crew."""
+
+    verbose: bool
+    memory: bool
+
+
+class InputConfig(BaseModel):
+    """Configuration for input data."""
+
+    key: str
+    value: str
+
+
+class CrewConfig(BaseModel):
+    """Configuration for the entire crew."""
+
+    crew: CrewSettings
+    agents: list[AgentConfig]
+    tasks: list[TaskConfig]
+    input: list[InputConfig]
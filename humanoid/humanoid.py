@@ -7,20 +7,41 @@
 
 import os
 import copy
+import logging
+import threading
 import traceback
-from typing import Union, Any, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Union, Any, List, Callable, Optional
 
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from openai import OpenAI
 from rich import print as rprint  # Add this import for rich printing
 from rich.pretty import Pretty  # Add this import for pretty printing
 
 from crewai import Agent, Task, Crew
-from crewai.crew import CrewOutput
-
+from crewai.tasks.task_output import TaskOutput
+
+from .config import (
+    AgentConfig,
+    AgentReference,
+    TaskConfig,
+    CrewSettings,
+    InputConfig,
+    CrewConfig,
+)
+from .optimizer import (
+    ConfigNormalizer,
+    ConfigPolicy,
+    NormalizedCrewConfig,
+    normalize_crew_config,
+)
+from .memory import MemoryBackend, get_memory_namespace, get_openai_embed_function
+from .output import OutputBuffer
 from .tooling import get_available_tools
 
+logger = logging.getLogger(__name__)
+
 
 class PreparedCrew(BaseModel):
     """Prepared crew model."""
@@ -28,55 +49,7 @@ class PreparedCrew(BaseModel):
     crew: Crew
     tasks: List[Task]
     input_data: dict
-
-
-class AgentConfig(BaseModel):
-    """Configuration for an agent."""
-
-    id: str
-    role: str
-    goal: str
-    backstory: str
-    allow_delegation: bool
-    verbose: bool
-
-
-class AgentReference(BaseModel):
-    """Reference to an agent by ID."""
-
-    id: str
-
-
-class TaskConfig(BaseModel):
-    """Configuration for a task."""
-
-    description: str
-    expected_output: str
-    tools: list[str]
-    agent: AgentReference
-
-
-class CrewSettings(BaseModel):
-    """Settings for the crew."""
-
-    verbose: bool
-    memory: bool
-
-
-class InputConfig(BaseModel):
-    """Configuration for input data."""
-
-    key: str
-    value: str
-
-
-class CrewConfig(BaseModel):
-    """Configuration for the entire crew."""
-
-    crew: CrewSettings
-    agents: list[AgentConfig]
-    tasks: list[TaskConfig]
-    input: list[InputConfig]
+    memory_namespace: Optional[str] = None
 
 
 class GenerateCrewError(BaseModel):
@@ -86,11 +59,104 @@ class GenerateCrewError(BaseModel):
     message: str
 
 
+class SpeculativeCrew:
+    """
+    Agents and tasks built on a thread pool while the crew config is still being generated.
+    - Each agent and task is built as soon as its config is complete in the stream.
+    - When preparing the crew, a prebuilt agent is only reused if the final config matches it exactly.
+    - Prebuilt tasks are keyed by description, expected output and agent ID rather than position,
+      so they survive tasks being dropped or reordered before preparation.
+    """
+
+    def __init__(
+        self,
+        build_agent: Callable[[AgentConfig], Agent],
+        build_task: Callable[[TaskConfig, Optional[Agent]], Task],
+        max_workers: int = 4,
+    ):
+        self.build_agent = build_agent
+        self.build_task = build_task
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="humanoid-prepare"
+        )
+        self.agents: dict[str, tuple[AgentConfig, Future]] = {}
+        self.tasks: dict[tuple, Future] = {}
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        """Runs a function on the preparation thread pool."""
+        return self.executor.submit(fn, *args)
+
+    def submit_agent(self, agent_config: AgentConfig) -> None:
+        """Starts building an agent."""
+        if agent_config.id in self.agents:
+            return
+        future = self.executor.submit(self.build_agent, agent_config)
+        self.agents[agent_config.id] = (agent_config, future)
+
+    def __task_key(self, task_config: TaskConfig) -> tuple:
+        return (task_config.description, task_config.expected_output, task_config.agent.id)
+
+    def submit_task(self, task_config: TaskConfig) -> None:
+        """Starts building a task once its agent is built."""
+        key = self.__task_key(task_config)
+        if key in self.tasks:
+            return
+        agent_future = self.agents.get(task_config.agent.id, (None, None))[1]
+
+        def build() -> Task:
+            agent = agent_future.result() if agent_future is not None else None
+            return self.build_task(task_config, agent)
+
+        self.tasks[key] = self.executor.submit(build)
+
+    def get_agent(self, agent_config: AgentConfig) -> Optional[Agent]:
+        """Returns the prebuilt agent for the config, if it was built from the same config."""
+        prebuilt_config, future = self.agents.get(agent_config.id, (None, None))
+        if prebuilt_config != agent_config:
+            return None
+        return self.__result(future)
+
+    def get_task(self, task_config: TaskConfig, agent: Optional[Agent]) -> Optional[Task]:
+        """
+        Returns the prebuilt task for the config, if one was built for the same agent.
+        Each prebuilt task is handed out at most once.
+        """
+        future = self.tasks.pop(self.__task_key(task_config), None)
+        if future is None:
+            return None
+        task = self.__result(future)
+        if task is None or task.agent is not agent:
+            return None
+        return task
+
+    def __result(self, future: Future) -> Any:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error while preparing crew ahead of time: {str(e)}")
+            return None
+
+    def shutdown(self) -> None:
+        """Waits for pending builds and releases the thread pool."""
+        self.executor.shutdown(wait=True)
+
+
 class Humanoid:
     """Main class for the Humanoid application."""
 
-    def __init__(self):
-        """Initialize the Humanoid instance."""
+    def __init__(
+        self,
+        output_memory_limit: Optional[int] = None,
+        memory_backend: Optional[MemoryBackend] = None,
+        config_policy: Optional[ConfigPolicy] = None,
+    ):
+        """Initialize the Humanoid instance.
+
+        Crew outputs larger than output_memory_limit bytes are spilled to disk.
+        Defaults to HUMANOID_OUTPUT_MEMORY_LIMIT, or 8 MiB.
+        Crews with memory enabled use memory_backend, or a local one created on first use.
+        Crew configs are normalized according to config_policy before they are run.
+        """
         rprint("🤖 [bold green]Initializing Humanoid...[/bold green]")
         init_result = self.init()
         if init_result.get("error"):
@@ -98,6 +164,10 @@ class Humanoid:
                 init_result.get("message") + " - Error:" + init_result.get("error")
             )
         self.ai: OpenAI = init_result.get("openai_client", None)
+        self.output_memory_limit = output_memory_limit
+        self.memory_backend = memory_backend
+        self.memory_lock = threading.Lock()
+        self.config_policy = config_policy or ConfigPolicy()
         rprint("✅ [bold green]Humanoid initialized successfully![/bold green]")
 
     def init(self) -> dict:
@@ -132,8 +202,45 @@ class Humanoid:
                 "message": "An unexpected error occurred while initializing the OpenAI API client.",
             }
 
-    def __prepare_crew_from_config(self, config: CrewConfig) -> PreparedCrew:
-        """Prepares the crew using the specified config and input data."""
+    def get_memory_backend(self) -> MemoryBackend:
+        """Returns the memory backend shared by all crews, creating it on first use."""
+        with self.memory_lock:
+            if self.memory_backend is None:
+                self.memory_backend = MemoryBackend(
+                    embed=get_openai_embed_function(self.ai)
+                )
+            return self.memory_backend
+
+    def close(self) -> None:
+        """Flushes and closes the memory backend, if one was opened."""
+        with self.memory_lock:
+            if self.memory_backend is not None:
+                self.memory_backend.close()
+
+    def __build_agent(self, agent_config: AgentConfig) -> Agent:
+        """Builds an agent with all available tools."""
+        agent_config_without_id = copy.deepcopy(agent_config.model_dump())
+        del agent_config_without_id["id"]
+        agent_config_without_id["tools"] = get_available_tools().tool_instances
+        return Agent(**agent_config_without_id, llm="gpt-4o")
+
+    def __build_task(self, task_config: TaskConfig, agent: Optional[Agent]) -> Task:
+        """Builds a task assigned to the given agent."""
+        task_config_without_agent = copy.deepcopy(task_config.model_dump())
+        del task_config_without_agent["agent"]
+        del task_config_without_agent["tools"]
+        return Task(**task_config_without_agent, agent=agent)
+
+    def __prepare_crew_from_config(
+        self,
+        config: CrewConfig,
+        task_callback: Optional[Callable[[TaskOutput], None]] = None,
+        speculative: Optional[SpeculativeCrew] = None,
+    ) -> PreparedCrew:
+        """Prepares the crew using the specified config and input data.
+
+        Agents and tasks already built by a speculative crew are reused when they match the config.
+        """
         rprint("🛠️ [bold blue]Preparing crew from config...[/bold blue]")
         agents_config = config.agents
         tasks_config = config.tasks
@@ -146,64 +253,138 @@ class Humanoid:
                 item = item.model_dump()
                 input_data[item["key"]] = item["value"]
 
-        agents = []
+        ## Initialize agents with tools, reusing warm tool instances across runs
+        rprint("🔧 [bold blue]Available tools:[/bold blue]")
+        rprint(Pretty(get_available_tools().tool_names, expand_all=True))
+        task_agents: dict[str, Agent] = {}
         for agent_config in agents_config:
-            agent_config_without_id = copy.deepcopy(agent_config.dict())
-            del agent_config_without_id["id"]
-            agent = Agent(**agent_config_without_id)
-            agents.append(agent)
+            if agent_config.id in task_agents:
+                continue
+            agent = speculative.get_agent(agent_config) if speculative else None
+            task_agents[agent_config.id] = agent or self.__build_agent(agent_config)
 
         tasks = []
         for task_config in tasks_config:
-            task_config_without_agent = copy.deepcopy(task_config.model_dump())
-            del task_config_without_agent["agent"]
-            del task_config_without_agent["tools"]
-            ## Initialize agent with tools
-            available_tools = get_available_tools()
-            tool_names = available_tools.tool_names
-            rprint("🔧 [bold blue]Available tools:[/bold blue]")
-            rprint(Pretty(tool_names, expand_all=True))  # Pretty print tool names
-            agent = None
-            for a in agents_config:
-                if a.id == task_config.agent.id:
-                    agent_config_without_id = copy.deepcopy(a.model_dump())
-                    del agent_config_without_id["id"]
-                    agent_config_without_id["tools"] = available_tools.tool_instances
-                    agent = Agent(**agent_config_without_id, llm="gpt-4o")
-                    break
-            task = Task(**task_config_without_agent, agent=agent)
-            tasks.append(task)
-        crew = Crew(
-            agents=agents,
+            agent = task_agents.get(task_config.agent.id)
+            task = speculative.get_task(task_config, agent) if speculative else None
+            tasks.append(task or self.__build_task(task_config, agent))
+        memory_kwargs = {}
+        memory_namespace = None
+        if crew_config.memory:
+            memory_namespace = get_memory_namespace(
+                [agent_config.model_dump() for agent_config in agents_config]
+            )
+            memories = self.get_memory_backend().get_memories(memory_namespace)
+            memory_kwargs = memories.as_crew_kwargs()
+        try:
+            ## The crew must hold the agents that run the tasks, since crewai reaches memory through agent.crew
+            crew = Crew(
+                agents=list(task_agents.values()),
+                tasks=tasks,
+                verbose=crew_config.verbose,
+                memory=crew_config.memory,
+                task_callback=task_callback,
+                **memory_kwargs,
+            )
+        except Exception:
+            if memory_namespace:
+                self.__release_memory(memory_namespace)
+            raise
+        rprint("✅ [bold green]Crew prepared successfully![/bold green]")
+        return PreparedCrew(
+            crew=crew,
             tasks=tasks,
-            verbose=crew_config.verbose,
-            memory=crew_config.memory,
+            input_data=input_data,
+            memory_namespace=memory_namespace,
         )
-        rprint("✅ [bold green]Crew prepared successfully![/bold green]")
-        return PreparedCrew(crew=crew, tasks=tasks, input_data=input_data)
 
-    def run_crew_from_config(self, config: CrewConfig) -> CrewOutput:
-        """Runs the crew using the specified config and input data."""
+    def __release_memory(self, namespace: str) -> None:
+        """Writes buffered memory items and releases the crew's memory, logging failures so that they do not fail the run."""
+        try:
+            self.get_memory_backend().release_memories(namespace)
+        except Exception as e:
+            logger.error(f"Error while flushing crew memory: {str(e)}")
+            logger.error(traceback.format_exc())
+
+    def __normalize_config(self, config: CrewConfig) -> NormalizedCrewConfig:
+        """Normalizes the crew config, reporting what changed and what running it is expected to cost."""
+        rprint("🧹 [bold blue]Normalizing crew config...[/bold blue]")
+        normalized = normalize_crew_config(config, self.config_policy)
+        for issue in normalized.issues:
+            rprint(f"⚠️ [yellow]{issue}[/yellow]")
+        rprint("💰 [bold blue]Estimated cost:[/bold blue]")
+        rprint(Pretty(normalized.estimate.model_dump(), expand_all=True))
+        if not normalized.config.tasks:
+            raise ValueError("The crew config has no runnable tasks.")
+        return normalized
+
+    def run_crew_from_config(
+        self,
+        config: CrewConfig,
+        task_callback: Optional[Callable[[TaskOutput], None]] = None,
+        speculative: Optional[SpeculativeCrew] = None,
+    ) -> Union[OutputBuffer, dict]:
+        """Runs the crew using the specified config and input data.
+
+        If a task callback is given, it is called with each task's output as soon as the task completes.
+        The report is returned as an OutputBuffer; the caller should close() it once consumed.
+        Changes made while normalizing the config are listed at the top of the report.
+        Each task's output is written to the buffer as soon as the task completes. Note that crewai itself
+        keeps every task output on its Task objects until the crew is released, so the buffer bounds
+        Humanoid's own copy of the report, not crewai's.
+        On failure, a dictionary with the error and a message is returned instead.
+        """
+        final_result = OutputBuffer(memory_limit=self.output_memory_limit)
+
+        def on_task_output(output: TaskOutput) -> None:
+            final_result.write(f"Task: {output.description}\n")
+            final_result.write("Output: ")
+            final_result.write(output.raw or "")
+            final_result.write("\n")
+            if task_callback:
+                task_callback(output)
+
+        prepared_crew = None
         try:
             rprint("🚀 [bold blue]Running crew from config...[/bold blue]")
-            prepared_crew = self.__prepare_crew_from_config(config)
+            normalized = self.__normalize_config(config)
+            config = normalized.config
+            if normalized.issues:
+                final_result.write("Config changes:\n")
+                for issue in normalized.issues:
+                    final_result.write(f"- {issue}\n")
+            prepared_crew = self.__prepare_crew_from_config(
+                config, task_callback=on_task_output, speculative=speculative
+            )
             crew = prepared_crew.crew
             crew.kickoff(inputs=prepared_crew.input_data)
-            final_result = ""
-            for task in prepared_crew.tasks:
-                final_result += f"Task: {task.description}\n"
-                final_result += f"Output: {task.output.raw}\n"
             rprint("✅ [bold green]Crew run successfully![/bold green]")
             return final_result
         except Exception as e:
+            final_result.close()
             rprint("❌ [bold red]Error running crew![/bold red]")
             traceback.print_exc()
-            return f"""
-            ## Error: Something went wrong! 😬
-            Error Details: 
-            
-            {str(e)}
+            return {
+                "error": str(e),
+                "message": "An unexpected error occurred while running the crew.",
+            }
+        finally:
+            if prepared_crew is not None and prepared_crew.memory_namespace:
+                self.__release_memory(prepared_crew.memory_namespace)
+
+    def __crew_config_messages(self, crew_spec: str) -> list[dict]:
+        """Returns the messages used to generate a crew configuration."""
+        prompt = f"""
+            Generate a crew configuration from the following crew spec:
+            Crew Spec: '''{crew_spec}'''
             """
+        return [
+            {
+                "role": "system",
+                "content": "You are an advanced AI agent for creating and generating agent configurations.",
+            },
+            {"role": "user", "content": prompt},
+        ]
 
     def generate_crew_config(
         self, crew_spec: str
@@ -211,19 +392,9 @@ class Humanoid:
         """Generates a crew configuration from the specified crew spec."""
         try:
             rprint("📝 [bold blue]Generating crew configuration...[/bold blue]")
-            prompt = f"""
-            Generate a crew configuration from the following crew spec:
-            Crew Spec: '''{crew_spec}'''
-            """
             response = self.ai.beta.chat.completions.parse(
                 model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an advanced AI agent for creating and generating agent configurations.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
+                messages=self.__crew_config_messages(crew_spec),
                 response_format=CrewConfig,
             )
             crew_config = response.choices[0].message.parsed
@@ -238,18 +409,110 @@ class Humanoid:
                 message="An unexpected error occurred while generating the crew configuration.",
             )
 
+    def stream_crew_config(
+        self,
+        crew_spec: str,
+        on_agent: Optional[Callable[[AgentConfig], None]] = None,
+        on_task: Optional[Callable[[TaskConfig], None]] = None,
+    ) -> Union[CrewConfig, GenerateCrewError]:
+        """
+        Generates a crew configuration from the specified crew spec, streaming the response.
+        - Calls on_agent with each agent config as soon as it is complete in the stream.
+        - Calls on_task with each task config as soon as it is complete in the stream.
+        - An entry is complete once the next entry or the next top-level field has started,
+          since structured outputs emit fields in schema order.
+        """
+        try:
+            rprint("📝 [bold blue]Streaming crew configuration...[/bold blue]")
+            seen_agents = 0
+            seen_tasks = 0
+            with self.ai.beta.chat.completions.stream(
+                model="gpt-4o-mini",
+                messages=self.__crew_config_messages(crew_spec),
+                response_format=CrewConfig,
+            ) as stream:
+                for event in stream:
+                    if event.type != "content.delta" or not isinstance(
+                        event.parsed, dict
+                    ):
+                        continue
+                    partial = event.parsed
+                    agents = partial.get("agents") or []
+                    complete_agents = len(agents) if "tasks" in partial else len(agents) - 1
+                    for agent in agents[seen_agents:complete_agents]:
+                        agent_config = self.__validate_partial(AgentConfig, agent)
+                        if on_agent and agent_config:
+                            on_agent(agent_config)
+                    seen_agents = max(seen_agents, complete_agents)
+                    tasks = partial.get("tasks") or []
+                    complete_tasks = len(tasks) if "input" in partial else len(tasks) - 1
+                    for index in range(seen_tasks, complete_tasks):
+                        task_config = self.__validate_partial(TaskConfig, tasks[index])
+                        if on_task and task_config:
+                            on_task(task_config)
+                    seen_tasks = max(seen_tasks, complete_tasks)
+                completion = stream.get_final_completion()
+            crew_config = completion.choices[0].message.parsed
+            rprint(
+                "✅ [bold green]Crew configuration generated successfully![/bold green]"
+            )
+            return crew_config
+        except Exception as e:
+            rprint("❌ [bold red]Error generating crew configuration![/bold red]")
+            return GenerateCrewError(
+                error=str(e),
+                message="An unexpected error occurred while generating the crew configuration.",
+            )
+
+    def __validate_partial(self, model: type, data: Any) -> Optional[BaseModel]:
+        """Validates a config entry from a streamed response, returning None if it is not usable."""
+        try:
+            return model.model_validate(data)
+        except ValidationError:
+            return None
+
     def pretty_print_config(self, config: CrewConfig) -> None:
         """Pretty prints the crew configuration."""
         rprint("📄 [bold blue]Pretty printing crew configuration...[/bold blue]")
         rprint(Pretty(config.model_dump(), expand_all=True))
 
-    def run(self, prompt: str) -> Any:
-        """Runs the Humanoid with the specified prompt."""
+    def run(
+        self,
+        prompt: str,
+        task_callback: Optional[Callable[[TaskOutput], None]] = None,
+        pipelined: bool = False,
+    ) -> Any:
+        """Runs the Humanoid with the specified prompt.
+
+        In pipelined mode, the crew config is streamed and agents and tasks are built while it is still being generated.
+        """
+        speculative = None
         try:
             rprint(
                 f"🏃 [bold blue]Running Humanoid with the following prompt: {prompt}[/bold blue]"
             )
-            crew_config = self.generate_crew_config(prompt)
+            if pipelined:
+                speculative = SpeculativeCrew(
+                    build_agent=self.__build_agent, build_task=self.__build_task
+                )
+                speculative.submit(get_available_tools)
+                normalizer = ConfigNormalizer(self.config_policy)
+
+                def on_task(task_config: TaskConfig) -> None:
+                    ## Only build what normalization keeps: agents are built once a kept task needs them
+                    task_config = normalizer.add_task(task_config)
+                    if task_config is None:
+                        return
+                    agent_config = normalizer.get_agent(task_config.agent.id)
+                    if agent_config is not None:
+                        speculative.submit_agent(agent_config)
+                    speculative.submit_task(task_config)
+
+                crew_config = self.stream_crew_config(
+                    prompt, on_agent=normalizer.add_agent, on_task=on_task
+                )
+            else:
+                crew_config = self.generate_crew_config(prompt)
             if isinstance(crew_config, GenerateCrewError):
                 return {
                     "error": crew_config.error,
@@ -258,10 +521,15 @@ class Humanoid:
             rprint("🛠️ [bold blue]Crew Config: [/bold blue]")
             self.pretty_print_config(crew_config)  # Call the pretty print method
             rprint("🚀 [bold blue]Running Crew from config...[/bold blue]")
-            return self.run_crew_from_config(crew_config)
+            return self.run_crew_from_config(
+                crew_config, task_callback=task_callback, speculative=speculative
+            )
         except Exception as e:
             rprint("❌ [bold red]Error running Humanoid![/bold red]")
             return {
                 "error": str(e),
                 "message": "An unexpected error occurred while running the crew.",
             }
+        finally:
+            if speculative is not None:
+                speculative.shutdown()
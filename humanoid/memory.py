@@ -0,0 +1,476 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: memory.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+
+import os
+import json
+import shutil
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+from crewai.memory.storage.interface import Storage
+from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_DIR = os.path.join(os.path.expanduser("~"), ".humanoid", "memory")
+DEFAULT_MAX_ITEMS = 2048
+DEFAULT_MAX_OPEN_NAMESPACES = 8
+DEFAULT_MAX_NAMESPACES = 64
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+DEFAULT_EMBEDDING_DIM = 1536
+LONG_TERM_DB_NAME = "long_term_memory_storage.db"
+
+EmbedFunction = Callable[[list[str]], list[list[float]]]
+
+
+class VectorMemoryStorage(Storage):
+    """
+    Bounded vector store for crewai memory, backed by SQLite and a memory-mapped vector file.
+    - Texts and metadata live in SQLite; normalized embeddings live in a fixed-size float32 file.
+    - Once max_items are stored, the least recently used item is evicted and its slot is reused.
+    - Saves are buffered and embedded in batches; searches flush the buffer first.
+    - If max_items changes between runs, the store is compacted and the vector file resized on open.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        embed: EmbedFunction,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dim: int = DEFAULT_EMBEDDING_DIM,
+    ):
+        os.makedirs(path, exist_ok=True)
+        self.embed = embed
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.dim = dim
+        self.pending: list[tuple[str, dict]] = []
+        self.lock = threading.RLock()
+        self.closed = False
+        self.db = sqlite3.connect(
+            os.path.join(path, "memory.db"), check_same_thread=False
+        )
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                slot INTEGER PRIMARY KEY,
+                value TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.db.commit()
+        self.vectors = self.__open_vectors(os.path.join(path, f"vectors_{dim}.f32"))
+
+    def __open_vectors(self, vectors_path: str) -> np.memmap:
+        """
+        Opens the vector file, sized for max_items.
+        - If the file was created with a different max_items, the most recently used items are kept,
+          moved to slots 0..n-1, and the file is resized.
+        """
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        expected_bytes = self.max_items * row_bytes
+        if not os.path.exists(vectors_path):
+            return np.memmap(
+                vectors_path, dtype=np.float32, mode="w+", shape=(self.max_items, self.dim)
+            )
+        if os.path.getsize(vectors_path) == expected_bytes:
+            return np.memmap(
+                vectors_path, dtype=np.float32, mode="r+", shape=(self.max_items, self.dim)
+            )
+
+        logger.info(f"Resizing memory store at {vectors_path} to {self.max_items} items.")
+        old_rows = os.path.getsize(vectors_path) // row_bytes
+        rows = self.db.execute(
+            "SELECT slot, value, metadata, created_at, accessed_at FROM items "
+            "WHERE slot < ? ORDER BY accessed_at DESC, created_at DESC LIMIT ?",
+            (old_rows, self.max_items),
+        ).fetchall()
+        kept_vectors = np.zeros((len(rows), self.dim), dtype=np.float32)
+        if rows and old_rows:
+            old_vectors = np.memmap(
+                vectors_path, dtype=np.float32, mode="r", shape=(old_rows, self.dim)
+            )
+            for new_slot, row in enumerate(rows):
+                kept_vectors[new_slot] = old_vectors[row[0]]
+            del old_vectors
+        self.db.execute("DELETE FROM items")
+        self.db.executemany(
+            "INSERT INTO items VALUES (?, ?, ?, ?, ?)",
+            [(new_slot, *row[1:]) for new_slot, row in enumerate(rows)],
+        )
+        os.truncate(vectors_path, expected_bytes)
+        vectors = np.memmap(
+            vectors_path, dtype=np.float32, mode="r+", shape=(self.max_items, self.dim)
+        )
+        vectors[: len(rows)] = kept_vectors
+        vectors.flush()
+        self.db.commit()
+        return vectors
+
+    def count(self) -> int:
+        """Returns the number of stored items, excluding unflushed saves."""
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def save(self, value: Any, metadata: dict[str, Any]) -> None:
+        """Buffers an item, embedding and writing the buffer once it reaches the batch size."""
+        with self.lock:
+            if self.closed:
+                logger.warning("Dropped an item saved to a closed memory store.")
+                return
+            self.pending.append((str(value), metadata or {}))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Embeds and writes all buffered items in a single batch.
+        If embedding fails, the items stay buffered and the error is raised.
+        Does nothing once the store is closed.
+        """
+        with self.lock:
+            if self.closed or not self.pending:
+                return
+            pending = list(self.pending)
+            embeddings = np.asarray(
+                self.embed([value or " " for value, _ in pending]), dtype=np.float32
+            )
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+            now = time.time()
+            for (value, metadata), embedding in zip(pending, embeddings):
+                slot = self.__next_slot()
+                self.vectors[slot] = embedding
+                self.db.execute(
+                    "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?)",
+                    (slot, value, json.dumps(metadata, default=str), now, now),
+                )
+            self.vectors.flush()
+            self.db.commit()
+            del self.pending[: len(pending)]
+
+    def __next_slot(self) -> int:
+        """Returns a free slot, evicting the least recently used item if the store is full."""
+        count = self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        if count < self.max_items:
+            return count
+        slot = self.db.execute(
+            "SELECT slot FROM items ORDER BY accessed_at ASC, created_at ASC LIMIT 1"
+        ).fetchone()[0]
+        self.db.execute("DELETE FROM items WHERE slot = ?", (slot,))
+        return slot
+
+    def search(
+        self, query: str, limit: int = 3, score_threshold: float = 0.35
+    ) -> list[dict[str, Any]]:
+        """Returns the stored items most similar to the query, by cosine similarity."""
+        with self.lock:
+            if self.closed:
+                return []
+            self.flush()
+            count = self.count()
+            if count == 0:
+                return []
+            embedding = np.asarray(self.embed([query])[0], dtype=np.float32)
+            norm = np.linalg.norm(embedding)
+            if norm:
+                embedding = embedding / norm
+            scores = self.vectors[:count] @ embedding
+            top = np.argsort(-scores)[:limit]
+            slots = [int(slot) for slot in top if scores[slot] >= score_threshold]
+            if not slots:
+                return []
+            rows = self.db.execute(
+                f"SELECT slot, value, metadata FROM items WHERE slot IN ({','.join('?' * len(slots))})",
+                slots,
+            ).fetchall()
+            self.db.execute(
+                f"UPDATE items SET accessed_at = ? WHERE slot IN ({','.join('?' * len(slots))})",
+                [time.time(), *slots],
+            )
+            self.db.commit()
+        by_slot = {row[0]: row for row in rows}
+        return [
+            {
+                "id": str(slot),
+                "context": by_slot[slot][1],
+                "metadata": json.loads(by_slot[slot][2]),
+                "score": float(scores[slot]),
+            }
+            for slot in slots
+            if slot in by_slot
+        ]
+
+    def reset(self) -> None:
+        """Removes all stored and buffered items."""
+        with self.lock:
+            self.pending = []
+            if self.closed:
+                return
+            self.db.execute("DELETE FROM items")
+            self.db.commit()
+
+    def close(self) -> None:
+        """Flushes buffered items and releases the database and vector file."""
+        with self.lock:
+            if self.closed:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error while flushing memory before close: {str(e)}")
+            self.closed = True
+            self.vectors.flush()
+            del self.vectors
+            self.db.close()
+
+
+class BoundedLTMSQLiteStorage(LTMSQLiteStorage):
+    """crewai's long-term memory storage, pruned to the most recent max_rows entries on every save."""
+
+    def __init__(self, db_path: str, max_rows: int = DEFAULT_MAX_ITEMS):
+        super().__init__(db_path=db_path)
+        self.max_rows = max_rows
+        self.bounded_db_path = db_path
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        super().save(*args, **kwargs)
+        try:
+            with sqlite3.connect(self.bounded_db_path) as conn:
+                conn.execute(
+                    "DELETE FROM long_term_memories WHERE id NOT IN "
+                    "(SELECT id FROM long_term_memories ORDER BY id DESC LIMIT ?)",
+                    (self.max_rows,),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error while pruning long-term memory: {str(e)}")
+
+
+class CrewMemories:
+    """Memories to pass to a crewai Crew, along with the vector storages backing them."""
+
+    def __init__(
+        self,
+        short_term_memory: ShortTermMemory,
+        long_term_memory: LongTermMemory,
+        entity_memory: EntityMemory,
+        storages: Optional[list[VectorMemoryStorage]] = None,
+    ):
+        self.short_term_memory = short_term_memory
+        self.long_term_memory = long_term_memory
+        self.entity_memory = entity_memory
+        self.storages = storages or []
+
+    def flush(self) -> None:
+        """
+        Writes all buffered memory items.
+        Storages that fail to flush keep their items buffered; the first error is raised after trying all of them.
+        """
+        error = None
+        for storage in self.storages:
+            try:
+                storage.flush()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Flushes and closes the vector storages."""
+        for storage in self.storages:
+            storage.close()
+
+    def as_crew_kwargs(self) -> dict:
+        """Returns the memories as keyword arguments for Crew."""
+        return {
+            "short_term_memory": self.short_term_memory,
+            "long_term_memory": self.long_term_memory,
+            "entity_memory": self.entity_memory,
+        }
+
+
+class MemoryBackend:
+    """
+    Shared, persistent memory for crews, reused across runs.
+    - Each namespace gets its own short-term and entity stores and long-term database, each capped at max_items.
+    - Crews hold a namespace's memories from get_memories until release_memories.
+    - At most max_open_namespaces are kept open; the least recently used namespace that no crew holds is closed.
+    - At most max_namespaces are kept on disk; the least recently used namespace that is not open is deleted.
+    """
+
+    def __init__(
+        self,
+        embed: EmbedFunction,
+        root_dir: Optional[str] = None,
+        max_items: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dim: int = DEFAULT_EMBEDDING_DIM,
+        max_open_namespaces: Optional[int] = None,
+        max_namespaces: Optional[int] = None,
+    ):
+        self.embed = embed
+        self.root_dir = root_dir or os.getenv("HUMANOID_MEMORY_DIR", DEFAULT_MEMORY_DIR)
+        self.max_items = max_items or int(
+            os.getenv("HUMANOID_MEMORY_MAX_ITEMS", DEFAULT_MAX_ITEMS)
+        )
+        self.batch_size = batch_size
+        self.dim = dim
+        self.max_open_namespaces = max_open_namespaces or int(
+            os.getenv("HUMANOID_MEMORY_MAX_OPEN", DEFAULT_MAX_OPEN_NAMESPACES)
+        )
+        self.max_namespaces = max_namespaces or int(
+            os.getenv("HUMANOID_MEMORY_MAX_NAMESPACES", DEFAULT_MAX_NAMESPACES)
+        )
+        self.memories: OrderedDict[str, CrewMemories] = OrderedDict()
+        self.holders: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def get_memories(self, namespace: str) -> CrewMemories:
+        """
+        Returns the memories for a namespace, opening them on first use.
+        The memories stay open until the caller hands them back with release_memories.
+        """
+        with self.lock:
+            memories = self.memories.get(namespace)
+            if memories is None:
+                memories = self.__open(namespace)
+                self.memories[namespace] = memories
+                self.__evict_from_disk()
+            self.memories.move_to_end(namespace)
+            self.holders[namespace] = self.holders.get(namespace, 0) + 1
+            self.__close_idle()
+            return memories
+
+    def release_memories(self, namespace: str) -> None:
+        """
+        Flushes a namespace's memories and hands them back, so they can be closed once no crew holds them.
+        Flush errors are raised after the memories are released.
+        """
+        with self.lock:
+            memories = self.memories.get(namespace)
+        try:
+            if memories is not None:
+                memories.flush()
+        finally:
+            with self.lock:
+                holders = self.holders.get(namespace, 0) - 1
+                if holders > 0:
+                    self.holders[namespace] = holders
+                else:
+                    self.holders.pop(namespace, None)
+                self.__close_idle()
+
+    def __open(self, namespace: str) -> CrewMemories:
+        """Opens the storages for a namespace."""
+        path = os.path.join(self.root_dir, namespace)
+        os.makedirs(path, exist_ok=True)
+        ## The directory's modification time tracks when the namespace was last used
+        os.utime(path)
+        short_term_storage = self.__storage(os.path.join(path, "short_term"))
+        entity_storage = self.__storage(os.path.join(path, "entities"))
+        return CrewMemories(
+            short_term_memory=ShortTermMemory(storage=short_term_storage),
+            long_term_memory=LongTermMemory(
+                storage=BoundedLTMSQLiteStorage(
+                    db_path=os.path.join(path, LONG_TERM_DB_NAME),
+                    max_rows=self.max_items,
+                )
+            ),
+            entity_memory=EntityMemory(storage=entity_storage),
+            storages=[short_term_storage, entity_storage],
+        )
+
+    def __storage(self, path: str) -> VectorMemoryStorage:
+        return VectorMemoryStorage(
+            path,
+            embed=self.embed,
+            max_items=self.max_items,
+            batch_size=self.batch_size,
+            dim=self.dim,
+        )
+
+    def __close_idle(self) -> None:
+        """Closes the least recently used namespaces no crew holds, until at most max_open_namespaces are open."""
+        idle = [namespace for namespace in self.memories if namespace not in self.holders]
+        while len(self.memories) > self.max_open_namespaces and idle:
+            namespace = idle.pop(0)
+            self.memories.pop(namespace).close()
+
+    def __evict_from_disk(self) -> None:
+        """Deletes the least recently used namespaces that are not open, until at most max_namespaces are on disk."""
+        namespaces = []
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if os.path.isfile(os.path.join(path, LONG_TERM_DB_NAME)):
+                namespaces.append((os.path.getmtime(path), name))
+        excess = len(namespaces) - self.max_namespaces
+        for _, name in sorted(namespaces):
+            if excess <= 0:
+                break
+            if name in self.memories:
+                continue
+            logger.info(f"Deleting least recently used memory namespace {name}.")
+            shutil.rmtree(os.path.join(self.root_dir, name), ignore_errors=True)
+            excess -= 1
+
+    def flush(self) -> None:
+        """
+        Writes all buffered memory items of the open namespaces.
+        Storages that fail to flush keep their items buffered; the first error is raised after trying all of them.
+        """
+        with self.lock:
+            open_memories = list(self.memories.values())
+        error = None
+        for memories in open_memories:
+            try:
+                memories.flush()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Flushes and closes all open namespaces."""
+        with self.lock:
+            for memories in self.memories.values():
+                memories.close()
+            self.memories.clear()
+            self.holders.clear()
+
+
+def get_memory_namespace(agents: list[dict]) -> str:
+    """
+    Derives a memory namespace from a crew's agents.
+    Crews with the same roles, goals and backstories share memory; other crews are isolated.
+    """
+    key = sorted(
+        (agent.get("role", ""), agent.get("goal", ""), agent.get("backstory", ""))
+        for agent in agents
+    )
+    return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:16]
+
+
+def get_openai_embed_function(client, model: str = DEFAULT_EMBEDDING_MODEL) -> EmbedFunction:
+    """Returns an embed function that embeds a batch of texts in a single OpenAI request."""
+
+    def embed(texts: list[str]) -> list[list[float]]:
+        response = client.embeddings.create(model=model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    return embed
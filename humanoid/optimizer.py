@@ -0,0 +1,228 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: optimizer.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .config import AgentConfig, AgentReference, CrewConfig, TaskConfig
+
+## Rough characters per token, used to estimate prompt sizes without a tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+class ConfigPolicy(BaseModel):
+    """Limits applied when normalizing a crew configuration."""
+
+    max_tasks: Optional[int] = 10
+    ## Opt-in, since single-agent crews commonly have many tasks.
+    max_tasks_per_agent: Optional[int] = None
+    merge_duplicate_agents: bool = True
+    drop_duplicate_tasks: bool = True
+    ## Expected LLM calls per task, including tool use iterations.
+    llm_calls_per_task: int = 3
+
+
+class CostEstimate(BaseModel):
+    """Rough cost estimate of running a crew configuration."""
+
+    agents: int
+    tasks: int
+    llm_calls: int
+    prompt_tokens: int
+
+
+class NormalizedCrewConfig(BaseModel):
+    """A normalized crew configuration, along with its cost estimate and the changes made to it."""
+
+    config: CrewConfig
+    estimate: CostEstimate
+    issues: list[str]
+
+
+def _agent_key(agent: AgentConfig) -> tuple:
+    """Returns the key under which identical agents are merged."""
+    return (
+        " ".join(agent.role.split()).casefold(),
+        " ".join(agent.goal.split()).casefold(),
+        " ".join(agent.backstory.split()).casefold(),
+        agent.allow_delegation,
+    )
+
+
+def _task_key(task: TaskConfig) -> tuple:
+    """Returns the key under which identical tasks are dropped."""
+    return (
+        " ".join(task.description.split()).casefold(),
+        " ".join(task.expected_output.split()).casefold(),
+        task.agent.id,
+    )
+
+
+def estimate_cost(
+    config: CrewConfig, policy: Optional[ConfigPolicy] = None
+) -> CostEstimate:
+    """
+    Estimates the cost of running a crew configuration.
+    - Each task is expected to take policy.llm_calls_per_task LLM calls.
+    - Each call is expected to send the agent's role, goal and backstory along with the task.
+    """
+    policy = policy or ConfigPolicy()
+    agents_by_id = {agent.id: agent for agent in config.agents}
+    prompt_chars = 0
+    for task in config.tasks:
+        agent = agents_by_id.get(task.agent.id)
+        agent_chars = (
+            len(agent.role) + len(agent.goal) + len(agent.backstory) if agent else 0
+        )
+        task_chars = len(task.description) + len(task.expected_output)
+        prompt_chars += (agent_chars + task_chars) * policy.llm_calls_per_task
+    return CostEstimate(
+        agents=len(config.agents),
+        tasks=len(config.tasks),
+        llm_calls=len(config.tasks) * policy.llm_calls_per_task,
+        prompt_tokens=prompt_chars // CHARS_PER_TOKEN,
+    )
+
+
+class ConfigNormalizer:
+    """
+    Incremental crew config normalizer.
+    - Agents are added first, then tasks, in config order; each entry is normalized as it is added.
+    - This lets entries be normalized while a config is still being streamed, before any agent is built.
+    """
+
+    def __init__(self, policy: Optional[ConfigPolicy] = None):
+        self.policy = policy or ConfigPolicy()
+        self.issues: list[str] = []
+        self.agents: list[AgentConfig] = []
+        self.tasks: list[TaskConfig] = []
+        self.agent_ids: dict[str, str] = {}
+        self.canonical_by_key: dict[tuple, str] = {}
+        self.fallback_ids: Optional[dict[str, str]] = None
+        self.seen_tasks: set[tuple] = set()
+        self.tasks_per_agent: dict[str, int] = {}
+        self.task_count = 0
+
+    def add_agent(self, agent: AgentConfig) -> Optional[AgentConfig]:
+        """
+        Indexes an agent by ID, merging it into an earlier identical agent if there is one.
+        Returns the agent if it is kept, or None if it was merged or dropped.
+        """
+        if agent.id in self.agent_ids:
+            self.issues.append(f"Dropped agent with duplicate ID '{agent.id}'.")
+            return None
+        self.fallback_ids = None
+        key = _agent_key(agent)
+        if self.policy.merge_duplicate_agents and key in self.canonical_by_key:
+            self.agent_ids[agent.id] = self.canonical_by_key[key]
+            self.issues.append(
+                f"Merged agent '{agent.id}' into identical agent '{self.canonical_by_key[key]}'."
+            )
+            return None
+        self.canonical_by_key[key] = agent.id
+        self.agent_ids[agent.id] = agent.id
+        self.agents.append(agent)
+        return agent
+
+    def resolve_agent_id(self, agent_id: str) -> Optional[str]:
+        """
+        Resolves an agent reference by ID, falling back to a case-insensitive match on ID or role,
+        or to the only agent if there is just one.
+        """
+        if agent_id in self.agent_ids:
+            return self.agent_ids[agent_id]
+        if self.fallback_ids is None:
+            self.fallback_ids = {}
+            for agent in self.agents:
+                self.fallback_ids.setdefault(agent.role.strip().casefold(), agent.id)
+            for known_id, canonical_id in self.agent_ids.items():
+                self.fallback_ids[known_id.strip().casefold()] = canonical_id
+        resolved = self.fallback_ids.get(agent_id.strip().casefold())
+        if resolved is None and len(self.agents) == 1:
+            resolved = self.agents[0].id
+        return resolved
+
+    def get_agent(self, agent_id: str) -> Optional[AgentConfig]:
+        """Returns the kept agent with the given canonical ID."""
+        return next((agent for agent in self.agents if agent.id == agent_id), None)
+
+    def add_task(self, task: TaskConfig) -> Optional[TaskConfig]:
+        """
+        Resolves a task's agent reference, then drops it if it is a duplicate or over a cap.
+        Returns the task, pointing at its canonical agent, or None if it was dropped.
+        """
+        index = self.task_count
+        self.task_count += 1
+        agent_id = self.resolve_agent_id(task.agent.id)
+        if agent_id is None:
+            self.issues.append(
+                f"Dropped task {index} referencing unknown agent '{task.agent.id}'."
+            )
+            return None
+        if agent_id != task.agent.id:
+            task = task.model_copy(update={"agent": AgentReference(id=agent_id)})
+        key = _task_key(task)
+        if self.policy.drop_duplicate_tasks and key in self.seen_tasks:
+            self.issues.append(f"Dropped task {index} duplicating an earlier task.")
+            return None
+        max_tasks_per_agent = self.policy.max_tasks_per_agent
+        if (
+            max_tasks_per_agent is not None
+            and self.tasks_per_agent.get(agent_id, 0) >= max_tasks_per_agent
+        ):
+            self.issues.append(
+                f"Dropped task {index}: agent '{agent_id}' already has {max_tasks_per_agent} tasks."
+            )
+            return None
+        if self.policy.max_tasks is not None and len(self.tasks) >= self.policy.max_tasks:
+            self.issues.append(
+                f"Dropped task {index}: crew already has {self.policy.max_tasks} tasks."
+            )
+            return None
+        self.seen_tasks.add(key)
+        self.tasks_per_agent[agent_id] = self.tasks_per_agent.get(agent_id, 0) + 1
+        self.tasks.append(task)
+        return task
+
+    def result(self, config: CrewConfig) -> NormalizedCrewConfig:
+        """Drops agents that ended up without tasks and returns the normalized config."""
+        issues = list(self.issues)
+        used_agents = []
+        for agent in self.agents:
+            if agent.id in self.tasks_per_agent:
+                used_agents.append(agent)
+            else:
+                issues.append(f"Dropped agent '{agent.id}' with no tasks.")
+        normalized = config.model_copy(
+            update={"agents": used_agents, "tasks": list(self.tasks)}
+        )
+        return NormalizedCrewConfig(
+            config=normalized,
+            estimate=estimate_cost(normalized, self.policy),
+            issues=issues,
+        )
+
+
+def normalize_crew_config(
+    config: CrewConfig, policy: Optional[ConfigPolicy] = None
+) -> NormalizedCrewConfig:
+    """
+    Normalizes a crew configuration before any agent is built.
+    - Merges agents with identical roles, goals and backstories.
+    - Resolves task agent references by ID, falling back to a case-insensitive match on ID or role,
+      or to the only agent if there is just one. Tasks that cannot be resolved are dropped.
+    - Drops duplicate tasks and applies the policy's task caps.
+    - Drops agents that have no tasks.
+    - Returns the normalized configuration, its cost estimate and a description of each change.
+    """
+    normalizer = ConfigNormalizer(policy)
+    for agent in config.agents:
+        normalizer.add_agent(agent)
+    for task in config.tasks:
+        normalizer.add_task(task)
+    return normalizer.result(config)
@@ -0,0 +1,159 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: output.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+
+import os
+import tempfile
+import threading
+from typing import IO, Iterator, Optional
+
+DEFAULT_MEMORY_LIMIT = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def get_default_memory_limit() -> int:
+    """Returns the per-run output memory limit in bytes, configurable via HUMANOID_OUTPUT_MEMORY_LIMIT."""
+    value = os.getenv("HUMANOID_OUTPUT_MEMORY_LIMIT")
+    if not value:
+        return DEFAULT_MEMORY_LIMIT
+    return int(value)
+
+
+class OutputBuffer:
+    """
+    Chunked text buffer for crew output.
+    - Keeps chunks in memory until the memory limit is reached.
+    - Past the limit, spills everything to a temporary file and appends to it from then on.
+    - Tracks the UTF-8 size incrementally, so measuring it never re-encodes the whole output.
+    """
+
+    def __init__(
+        self, memory_limit: Optional[int] = None, spill_dir: Optional[str] = None
+    ):
+        self.memory_limit = (
+            memory_limit if memory_limit is not None else get_default_memory_limit()
+        )
+        self.spill_dir = spill_dir
+        self.size = 0
+        self.chunks: list[bytes] = []
+        self.file: Optional[IO[bytes]] = None
+        self.lock = threading.Lock()
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the output has been spilled to disk."""
+        return self.file is not None
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the spill file, if the output has been spilled to disk."""
+        return self.file.name if self.file is not None else None
+
+    def write(self, text: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Appends text to the buffer. Returns the number of bytes written.
+        The text is encoded and written in slices of chunk_size characters, so a large text is never encoded at once.
+        """
+        written = 0
+        for start in range(0, len(text), chunk_size):
+            data = text[start : start + chunk_size].encode("utf-8")
+            with self.lock:
+                if self.file is None and self.size + len(data) > self.memory_limit:
+                    self.__spill()
+                if self.file is not None:
+                    self.file.write(data)
+                else:
+                    self.chunks.append(data)
+                self.size += len(data)
+            written += len(data)
+        return written
+
+    def __spill(self) -> None:
+        """Moves the in-memory chunks to a temporary file."""
+        self.file = tempfile.NamedTemporaryFile(
+            prefix="humanoid_output_", suffix=".md", dir=self.spill_dir, delete=False
+        )
+        for chunk in self.chunks:
+            self.file.write(chunk)
+        self.chunks = []
+
+    def iter_bytes(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yields the buffered output as UTF-8 encoded chunks."""
+        with self.lock:
+            if self.file is None:
+                chunks = list(self.chunks)
+            else:
+                self.file.flush()
+                chunks = None
+                path = self.file.name
+        if chunks is not None:
+            yield from chunks
+            return
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def iter_text(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Yields the buffered output as text chunks, never splitting a multi-byte character."""
+        pending = b""
+        for chunk in self.iter_bytes(chunk_size):
+            pending += chunk
+            try:
+                text = pending.decode("utf-8")
+                pending = b""
+            except UnicodeDecodeError as e:
+                text = pending[: e.start].decode("utf-8")
+                pending = pending[e.start :]
+            if text:
+                yield text
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+
+    def write_to(self, f: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Writes the buffered output to a text file incrementally."""
+        for text in self.iter_text(chunk_size):
+            f.write(text)
+
+    def preview(self, max_bytes: int = DEFAULT_CHUNK_SIZE) -> str:
+        """Returns the beginning of the output, at most max_bytes long."""
+        data = b""
+        for chunk in self.iter_bytes(max_bytes):
+            data += chunk[: max_bytes - len(data)]
+            if len(data) >= max_bytes:
+                break
+        return data.decode("utf-8", errors="ignore")
+
+    def getvalue(self) -> str:
+        """Returns the whole output as a single string. Avoid on spilled outputs."""
+        return "".join(self.iter_text())
+
+    def close(self) -> None:
+        """Releases the buffered output, deleting the spill file if there is one."""
+        with self.lock:
+            self.chunks = []
+            if self.file is not None:
+                self.file.close()
+                try:
+                    os.remove(self.file.name)
+                except FileNotFoundError:
+                    pass
+                self.file = None
+            self.size = 0
+
+    def __enter__(self) -> "OutputBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __str__(self) -> str:
+        return self.getvalue()
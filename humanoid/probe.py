@@ -0,0 +1,57 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: probe.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+# Usage: python -m humanoid.probe [--tools TOOL_A,TOOL_B] [--workers N]
+#
+# Checks which tools are available and test-builds the given tools. Built tools only live in this
+# process; a serving process warms its own tools at startup (see HUMANOID_WARM_TOOLS).
+#
+
+import argparse
+
+from dotenv import load_dotenv
+from rich import print as rprint
+from rich.table import Table
+
+from .tooling import DEFAULT_PROBE_WORKERS, probe_tools
+
+
+def main() -> None:
+    """Entry point for `python -m humanoid.probe`. Probes all tools and test-builds the requested ones."""
+    load_dotenv(dotenv_path=".env", override=True)
+    parser = argparse.ArgumentParser(
+        description="Check tool availability and test-build tools."
+    )
+    parser.add_argument(
+        "--tools",
+        help="Comma-separated tool names to test-build. Defaults to the warm set (HUMANOID_WARM_TOOLS, or all tools).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_PROBE_WORKERS,
+        help="Number of tools probed in parallel.",
+    )
+    args = parser.parse_args()
+    tool_names = args.tools.split(",") if args.tools else None
+
+    rprint("🔍 [bold blue]Probing tools...[/bold blue]")
+    availability = probe_tools(tool_names, max_workers=args.workers)
+    table = Table(title="Tool Availability")
+    table.add_column("Tool")
+    table.add_column("Available")
+    table.add_column("Reason")
+    for tool_name, tool_availability in availability.items():
+        table.add_row(
+            tool_name,
+            "✅" if tool_availability.available else "❌",
+            tool_availability.reason or "",
+        )
+    rprint(table)
+
+
+if __name__ == "__main__":
+    main()
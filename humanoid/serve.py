@@ -0,0 +1,466 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: serve.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+# Usage: python -m humanoid.serve [--host HOST] [--port PORT] [--workers N] [--max-queue N] [--pipelined]
+#
+# Endpoints:
+#   POST /jobs              {"prompt": "..."} or {"config": {...CrewConfig...}} -> 202 {"id": ...}
+#   GET  /jobs/<id>         Poll a job's status and result. Large results are only available via /result.
+#   GET  /jobs/<id>/result  Download a finished job's result as text, streamed from memory or disk.
+#   GET  /jobs/<id>/stream  Stream a job's events as newline-delimited JSON until it finishes.
+#   GET  /health            Queue depth and worker count.
+#
+# With --workers > 1, concurrent crews share the same tool instances (including their usage counters).
+#
+
+import os
+import json
+import uuid
+import queue
+import logging
+import argparse
+import threading
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from rich import print as rprint
+from rich.pretty import Pretty
+
+from .humanoid import Humanoid, CrewConfig
+from .output import OutputBuffer
+from .tooling import warm_up_tools
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 1
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_MAX_FINISHED_JOBS = 256
+MAX_REQUEST_BYTES = 1024 * 1024
+MAX_INLINE_RESULT_BYTES = 64 * 1024
+
+
+class JobStatus:
+    """Lifecycle states of a job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    FINISHED = (SUCCEEDED, FAILED)
+
+
+class Job:
+    """A queued prompt or crew config, along with the events it has produced so far."""
+
+    def __init__(self, prompt: Optional[str] = None, config: Optional[CrewConfig] = None):
+        self.id = uuid.uuid4().hex
+        self.prompt = prompt
+        self.config = config
+        self.status = JobStatus.QUEUED
+        self.result: Any = None
+        self.events: list[dict] = []
+        self.condition = threading.Condition(threading.RLock())
+        self.add_event({"event": "status", "status": self.status})
+
+    def add_event(self, event: dict) -> None:
+        """Records an event and wakes up any streaming readers."""
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def set_status(self, status: str) -> None:
+        """Updates the job status and records it as an event, so readers never see one without the other."""
+        with self.condition:
+            self.status = status
+            self.add_event({"event": "status", "status": status})
+
+    def finish(self, status: str, result: Any) -> None:
+        """Stores the final result and marks the job as finished."""
+        with self.condition:
+            self.result = result
+            self.add_event({"event": "result", **self.result_dict()})
+            self.set_status(status)
+
+    def result_dict(self) -> dict:
+        """Returns the result, inlined only when it is small enough to send as JSON."""
+        if not isinstance(self.result, OutputBuffer):
+            return {"result": self.result}
+        inline = self.result.size <= MAX_INLINE_RESULT_BYTES
+        return {
+            "result": self.result.getvalue() if inline else None,
+            "result_size": self.result.size,
+            "result_url": f"/jobs/{self.id}/result",
+        }
+
+    def close(self) -> None:
+        """Releases the job's buffered output."""
+        if isinstance(self.result, OutputBuffer):
+            self.result.close()
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serializable summary of the job."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            **self.result_dict(),
+        }
+
+
+class JobQueue:
+    """Bounded job queue processed by worker threads that share a single Humanoid."""
+
+    def __init__(
+        self,
+        humanoid: Humanoid,
+        workers: int = DEFAULT_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS,
+        pipelined: bool = False,
+    ):
+        self.humanoid = humanoid
+        self.pipelined = pipelined
+        self.workers = workers
+        self.max_finished_jobs = max_finished_jobs
+        self.pending: "queue.Queue[Job]" = queue.Queue(maxsize=max_queue)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.threads = [
+            threading.Thread(target=self.__work, name=f"humanoid-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self) -> None:
+        """Starts the worker threads."""
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, job: Job) -> bool:
+        """Queues a job. Returns False if the queue is full."""
+        try:
+            self.pending.put_nowait(job)
+        except queue.Full:
+            return False
+        with self.lock:
+            self.jobs[job.id] = job
+            self.__evict_finished_jobs()
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns the job with the given ID, if it is still known."""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def depth(self) -> int:
+        """Returns the number of jobs waiting to be picked up."""
+        return self.pending.qsize()
+
+    def __evict_finished_jobs(self) -> None:
+        """Forgets the oldest finished jobs once more than the retention limit are kept."""
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in JobStatus.FINISHED
+        ]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            self.jobs.pop(job_id).close()
+
+    def __work(self) -> None:
+        """Processes jobs from the queue until the process exits."""
+        while True:
+            job = self.pending.get()
+            try:
+                self.__run_job(job)
+            finally:
+                self.pending.task_done()
+
+    def __run_job(self, job: Job) -> None:
+        """Runs a single job and records its outcome."""
+        job.set_status(JobStatus.RUNNING)
+
+        def on_task_output(output) -> None:
+            raw = output.raw or ""
+            ## Slice by characters first, so that only a bounded prefix is ever encoded
+            data = raw[:MAX_INLINE_RESULT_BYTES].encode("utf-8")
+            job.add_event(
+                {
+                    "event": "task",
+                    "description": output.description,
+                    "output": data[:MAX_INLINE_RESULT_BYTES].decode("utf-8", errors="ignore"),
+                    "truncated": len(raw) > MAX_INLINE_RESULT_BYTES
+                    or len(data) > MAX_INLINE_RESULT_BYTES,
+                }
+            )
+
+        try:
+            if job.config is not None:
+                result = self.humanoid.run_crew_from_config(
+                    job.config, task_callback=on_task_output
+                )
+            else:
+                result = self.humanoid.run(
+                    job.prompt, task_callback=on_task_output, pipelined=self.pipelined
+                )
+        except Exception as e:
+            logger.error(f"Error while running job {job.id}: {str(e)}")
+            logger.error(traceback.format_exc())
+            job.finish(
+                JobStatus.FAILED,
+                {
+                    "error": str(e),
+                    "message": "An unexpected error occurred while running the job.",
+                },
+            )
+            return
+        if isinstance(result, OutputBuffer):
+            job.finish(JobStatus.SUCCEEDED, result)
+        elif isinstance(result, dict):
+            job.finish(JobStatus.FAILED, result)
+        else:
+            job.finish(
+                JobStatus.FAILED,
+                {
+                    "error": str(result),
+                    "message": "The run did not produce a result.",
+                },
+            )
+
+
+class HumanoidRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler exposing the job queue."""
+
+    server: "HumanoidServer"
+
+    def do_GET(self) -> None:
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts == ["health"]:
+            self.__send_json(
+                HTTPStatus.OK,
+                {
+                    "status": "ok",
+                    "queue_depth": self.server.jobs.depth(),
+                    "workers": self.server.jobs.workers,
+                },
+            )
+            return
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.server.jobs.get(parts[1])
+            if job is None:
+                self.__send_error(HTTPStatus.NOT_FOUND, "Job not found.")
+                return
+            if len(parts) == 2:
+                self.__send_json(HTTPStatus.OK, job.to_dict())
+                return
+            if parts[2] == "stream":
+                self.__stream_job(job)
+                return
+            if parts[2] == "result":
+                self.__send_result(job)
+                return
+        self.__send_error(HTTPStatus.NOT_FOUND, "Not found.")
+
+    def do_POST(self) -> None:
+        if self.path.split("?")[0].rstrip("/") != "/jobs":
+            self.__send_error(HTTPStatus.NOT_FOUND, "Not found.")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self.__send_error(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header.")
+            return
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self.__send_error(
+                HTTPStatus.BAD_REQUEST,
+                f"Request body must be between 1 and {MAX_REQUEST_BYTES} bytes.",
+            )
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError as e:
+            self.__send_error(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {str(e)}")
+            return
+        if not isinstance(payload, dict):
+            self.__send_error(HTTPStatus.BAD_REQUEST, "Request body must be an object.")
+            return
+
+        prompt = payload.get("prompt")
+        config = payload.get("config")
+        if config is not None:
+            try:
+                job = Job(config=CrewConfig.model_validate(config))
+            except ValidationError as e:
+                self.__send_error(HTTPStatus.BAD_REQUEST, f"Invalid config: {str(e)}")
+                return
+        elif isinstance(prompt, str) and prompt.strip():
+            job = Job(prompt=prompt)
+        else:
+            self.__send_error(
+                HTTPStatus.BAD_REQUEST, "Either 'prompt' or 'config' is required."
+            )
+            return
+
+        if not self.server.jobs.submit(job):
+            self.__send_error(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                "Job queue is full. Try again later.",
+                headers={"Retry-After": "5"},
+            )
+            return
+        self.__send_json(
+            HTTPStatus.ACCEPTED,
+            {
+                "id": job.id,
+                "status": job.status,
+                "poll": f"/jobs/{job.id}",
+                "stream": f"/jobs/{job.id}/stream",
+            },
+        )
+
+    def __stream_job(self, job: Job) -> None:
+        """Writes the job's events as newline-delimited JSON until the job finishes."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        sent = 0
+        while True:
+            with job.condition:
+                while sent == len(job.events) and job.status not in JobStatus.FINISHED:
+                    job.condition.wait()
+                events = job.events[sent:]
+                sent += len(events)
+                done = job.status in JobStatus.FINISHED and sent == len(job.events)
+            try:
+                for event in events:
+                    self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            if done:
+                return
+
+    def __send_result(self, job: Job) -> None:
+        """Writes a finished job's output as text, chunk by chunk."""
+        if job.status not in JobStatus.FINISHED:
+            self.__send_error(HTTPStatus.CONFLICT, "Job has not finished yet.")
+            return
+        if not isinstance(job.result, OutputBuffer):
+            self.__send_json(HTTPStatus.OK, job.to_dict())
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/markdown; charset=utf-8")
+        self.send_header("Content-Length", str(job.result.size))
+        self.end_headers()
+        try:
+            for chunk in job.result.iter_bytes():
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        except FileNotFoundError:
+            ## The job was evicted and its spill file deleted mid-download; the length no longer matches
+            logger.warning(f"Result of job {job.id} was released while being sent.")
+            self.close_connection = True
+
+    def __send_json(
+        self, status: HTTPStatus, body: dict, headers: Optional[dict] = None
+    ) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def __send_error(
+        self, status: HTTPStatus, message: str, headers: Optional[dict] = None
+    ) -> None:
+        self.__send_json(
+            status, {"error": status.phrase, "message": message}, headers=headers
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+class HumanoidServer(ThreadingHTTPServer):
+    """HTTP server holding a long-lived Humanoid and its job queue."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, jobs: JobQueue):
+        super().__init__(address, HumanoidRequestHandler)
+        self.jobs = jobs
+
+
+def main() -> None:
+    """Entry point for `python -m humanoid.serve`."""
+    load_dotenv(dotenv_path=".env", override=True)
+    parser = argparse.ArgumentParser(description="Run Humanoid as an HTTP service.")
+    parser.add_argument(
+        "--host", default=os.getenv("HUMANOID_HOST", DEFAULT_HOST), help="Bind address."
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("HUMANOID_PORT", DEFAULT_PORT)),
+        help="Bind port.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("HUMANOID_WORKERS", DEFAULT_WORKERS)),
+        help="Number of jobs run concurrently. Concurrent crews share the same tool instances.",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=int(os.getenv("HUMANOID_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+        help="Maximum number of waiting jobs before requests are rejected with 429.",
+    )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        default=os.getenv("HUMANOID_PIPELINED", "").lower() in ("1", "true", "yes"),
+        help="Build agents while the crew config is still being generated.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    humanoid = Humanoid()
+    rprint("🔧 [bold blue]Warming up tools...[/bold blue]")
+    warmed_up = warm_up_tools()
+    rprint(Pretty(warmed_up.tool_names, expand_all=True))
+    jobs = JobQueue(
+        humanoid,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        pipelined=args.pipelined,
+    )
+    jobs.start()
+    server = HumanoidServer((args.host, args.port), jobs)
+    rprint(
+        f"🌐 [bold green]Humanoid serving on http://{args.host}:{args.port}[/bold green]"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        rprint("👋 [bold blue]Shutting down Humanoid server...[/bold blue]")
+    finally:
+        server.server_close()
+        humanoid.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,11 @@
 
 import os
 import logging
+import threading
 import traceback
 import enum
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
 from pydantic import BaseModel
 from crewai.tools import BaseTool
 from crewai_tools import (
@@ -100,26 +103,210 @@ class AvailableTools(BaseModel):
     tool_names: list[str]
 
 
-def get_available_tools() -> AvailableTools:
+class ToolAvailability(BaseModel):
+    """Availability of a tool, as determined by the tool probe."""
+
+    tool_name: str
+    available: bool
+    reason: Optional[str] = None
+
+
+## Environment variables a tool cannot be initialized without, checked before constructing it.
+TOOL_ENV_REQUIREMENTS: dict[ToolType, list[str]] = {
+    ToolType.BROWSERBASE: ["BROWSERBASE_API_KEY", "BROWSERBASE_PROJECT_ID"],
+    ToolType.COMPOSIO_TOOL: ["COMPOSIO_API_KEY"],
+    ToolType.EXA_SEARCH_TOOL: ["EXA_API_KEY"],
+    ToolType.FIRECRAWL_CRAWL_WEBSITE_TOOL: ["FIRECRAWL_API_KEY"],
+    ToolType.FIRECRAWL_SCRAPE_WEBSITE_TOOL: ["FIRECRAWL_API_KEY"],
+    ToolType.FIRECRAWL_SEARCH_TOOL: ["FIRECRAWL_API_KEY"],
+    ToolType.GITHUB_SEARCH_TOOL: ["GITHUB_TOKEN"],
+    ToolType.SERPER_DEV_TOOL: ["SERPER_API_KEY"],
+    ToolType.SPIDER_TOOL: ["SPIDER_API_KEY"],
+}
+
+## Tools get_tool cannot initialize without tool-specific arguments, so they are never available to agents.
+TOOL_ARG_REQUIREMENTS: dict[ToolType, list[str]] = {
+    ToolType.COMPOSIO_TOOL: ["from_action", "from_app"],
+    ToolType.MYSQL_SEARCH_TOOL: ["db_uri", "table_name"],
+    ToolType.NL2SQL_TOOL: ["db_uri"],
+    ToolType.PG_SEARCH_TOOL: ["db_uri", "table_name"],
+}
+
+DEFAULT_PROBE_WORKERS = 8
+
+_probe_lock = threading.Lock()
+_tool_availability: Optional[dict[str, ToolAvailability]] = None
+_tool_instances: dict[str, BaseTool] = {}
+
+
+def normalize_tool_names(tool_names: Iterable[str]) -> list[str]:
+    """Normalizes tool names to ToolType member names, e.g. 'serper_dev_tool' to 'SERPER_DEV_TOOL'."""
+    names = []
+    for name in tool_names:
+        name = name.strip().upper()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_warm_tool_names() -> list[str]:
+    """
+    Retrieves the names of the tools to build ahead of time, before the first crew needs them.
+    Uses HUMANOID_WARM_TOOLS (comma-separated) if set, otherwise all tools.
+    """
+    env_tool_names = os.getenv("HUMANOID_WARM_TOOLS")
+    if env_tool_names:
+        return normalize_tool_names(env_tool_names.split(","))
+    return list(get_tools_list())
+
+
+def _check_tool_env(tool: str) -> ToolAvailability:
+    """Checks the arguments and environment variables a tool requires, without initializing it."""
+    required_args = TOOL_ARG_REQUIREMENTS.get(ToolType[tool])
+    if required_args:
+        return ToolAvailability(
+            tool_name=tool,
+            available=False,
+            reason=f"Tool requires arguments to be initialized: {', '.join(required_args)}",
+        )
+    missing = [
+        env_var
+        for env_var in TOOL_ENV_REQUIREMENTS.get(ToolType[tool], [])
+        if not os.getenv(env_var)
+    ]
+    if missing:
+        return ToolAvailability(
+            tool_name=tool,
+            available=False,
+            reason=f"Missing environment variables: {', '.join(missing)}",
+        )
+    return ToolAvailability(
+        tool_name=tool,
+        available=True,
+        reason="Environment checks passed; not built yet.",
+    )
+
+
+def _build_tool(tool: str) -> tuple[ToolAvailability, Optional[BaseTool]]:
+    """
+    Builds a single tool.
+    - Checks the arguments and environment variables the tool requires.
+    - Tries to initialize the tool with default arguments.
+    - Returns the availability along with the initialized tool, if any.
+    """
+    availability = _check_tool_env(tool)
+    if not availability.available:
+        return availability, None
+    try:
+        tool_instance = get_tool(tool_id=ToolType[tool], args={})
+    except Exception as e:
+        logger.warning(f"Tool {tool} is unavailable: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return ToolAvailability(tool_name=tool, available=False, reason=str(e)), None
+    if not tool_instance:
+        return (
+            ToolAvailability(
+                tool_name=tool,
+                available=False,
+                reason="Tool requires arguments to be initialized.",
+            ),
+            None,
+        )
+    return ToolAvailability(tool_name=tool, available=True), tool_instance
+
+
+def _build_tools(
+    tools: list[str], max_workers: int
+) -> list[tuple[ToolAvailability, Optional[BaseTool]]]:
+    """Builds tools in parallel on a thread pool."""
+    if not tools:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="humanoid-tool-probe"
+    ) as executor:
+        return list(executor.map(_build_tool, tools))
+
+
+def probe_tools(
+    tool_names: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_PROBE_WORKERS,
+    refresh: bool = False,
+) -> dict[str, ToolAvailability]:
     """
-    Retrieves the list of available tools and initializes them.
-    - Gets a list of all available tools.
-    - Initializes each tool.
-    - Returns a dictionary of all available tools.
+    Probes all tools and caches their availability.
+    - Every tool gets its arguments and environment variables checked once per process, unless refresh is set.
+    - The given tools (by default the warm set, see get_warm_tool_names) are also built in parallel,
+      unless they are already built, and the instances are cached.
+    - Unknown tool names are logged and skipped.
+    - Returns a dictionary of tool names to their availability.
     """
-    all_tools = get_tools_list()
-    tools = []
-    tool_names = []
-    for tool in all_tools:
-        try:
-            tool_instance = get_tool(tool_id=ToolType[tool], args={})
+    global _tool_availability
+    if tool_names is None:
+        tool_names = get_warm_tool_names()
+    tool_names = normalize_tool_names(tool_names)
+    with _probe_lock:
+        if _tool_availability is None or refresh:
+            _tool_availability = {
+                tool: _check_tool_env(tool) for tool in get_tools_list()
+            }
+            _tool_instances.clear()
+        to_build = []
+        for tool in tool_names:
+            if tool not in _tool_availability:
+                logger.warning(f"Cannot build unknown tool {tool}.")
+            elif tool not in _tool_instances and _tool_availability[tool].available:
+                to_build.append(tool)
+        for tool, (tool_availability, tool_instance) in zip(
+            to_build, _build_tools(to_build, max_workers)
+        ):
+            _tool_availability[tool] = tool_availability
             if tool_instance:
-                tools.append(tool_instance)
-                tool_names.append(tool)
-        except Exception as e:
-            logger.error(f"Error while initializing tool {tool}: {str(e)}")
-            logger.error(traceback.format_exc())
-    return AvailableTools(tool_instances=tools, tool_names=tool_names)
+                _tool_instances[tool] = tool_instance
+        return dict(_tool_availability)
+
+
+def get_tool_availability(tool_name: str) -> Optional[ToolAvailability]:
+    """
+    Retrieves the cached availability of a tool, probing all tools on first use.
+    Returns None for unknown tool names.
+    """
+    return probe_tools().get(tool_name)
+
+
+def is_tool_available(tool_name: str) -> bool:
+    """Checks whether a tool is available, probing all tools on first use."""
+    availability = get_tool_availability(tool_name)
+    return availability is not None and availability.available
+
+
+def warm_up_tools(
+    tool_names: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_PROBE_WORKERS,
+) -> AvailableTools:
+    """
+    Builds tools ahead of time so the first crew does not pay for their initialization.
+    - If no tool names are given, the warm set from get_warm_tool_names is used.
+    - Tools that are not built yet are built in parallel and cached for the rest of the process.
+    - Unavailable or unknown tools are skipped.
+    - Returns the built tools among the given ones.
+    """
+    if tool_names is None:
+        tool_names = get_warm_tool_names()
+    tool_names = normalize_tool_names(tool_names)
+    probe_tools(tool_names, max_workers=max_workers)
+    with _probe_lock:
+        names = [tool for tool in tool_names if tool in _tool_instances]
+        tools = [_tool_instances[tool] for tool in names]
+    return AvailableTools(tool_instances=tools, tool_names=names)
+
+
+def get_available_tools() -> AvailableTools:
+    """
+    Retrieves the tools handed to agents: every tool that could be initialized.
+    - Tools in the warm set are usually built already; any other tool is built on first use.
+    - Tools are built once per process and reused afterwards.
+    """
+    return warm_up_tools(get_tools_list())
 
 
 def get_tool(tool_id: ToolType, args: dict) -> BaseTool:
@@ -0,0 +1,181 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: test_memory.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+
+import os
+
+import pytest
+
+from humanoid import memory
+from humanoid.memory import MemoryBackend, VectorMemoryStorage
+
+DIM = 4
+
+## One orthogonal embedding per text, so each text is only similar to itself.
+EMBEDDINGS = {
+    "alpha": [1.0, 0.0, 0.0, 0.0],
+    "beta": [0.0, 1.0, 0.0, 0.0],
+    "gamma": [0.0, 0.0, 1.0, 0.0],
+    "delta": [0.0, 0.0, 0.0, 1.0],
+}
+
+
+def fake_embed(texts: list[str]) -> list[list[float]]:
+    return [EMBEDDINGS[text] for text in texts]
+
+
+class FakeClock:
+    """Strictly increasing clock, so access order never depends on timer resolution."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self) -> float:
+        self.now += 1.0
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(memory, "time", fake_clock)
+    return fake_clock
+
+
+def open_storage(path, max_items: int, batch_size: int = 1, embed=fake_embed):
+    return VectorMemoryStorage(
+        str(path), embed=embed, max_items=max_items, batch_size=batch_size, dim=DIM
+    )
+
+
+def stored_values(storage: VectorMemoryStorage) -> set[str]:
+    return {row[0] for row in storage.db.execute("SELECT value FROM items")}
+
+
+def test_search_returns_most_similar_item(tmp_path):
+    storage = open_storage(tmp_path, max_items=4)
+    storage.save("alpha", {"kind": "note"})
+    storage.save("beta", {})
+
+    results = storage.search("alpha")
+
+    assert [result["context"] for result in results] == ["alpha"]
+    assert results[0]["metadata"] == {"kind": "note"}
+    assert results[0]["score"] == pytest.approx(1.0)
+    storage.close()
+
+
+def test_full_store_evicts_least_recently_used_and_reuses_its_slot(tmp_path):
+    storage = open_storage(tmp_path, max_items=2)
+    storage.save("alpha", {})
+    storage.save("beta", {})
+    beta_slot = storage.db.execute(
+        "SELECT slot FROM items WHERE value = 'beta'"
+    ).fetchone()[0]
+    ## Searching touches alpha, leaving beta as the least recently used item
+    storage.search("alpha")
+
+    storage.save("gamma", {})
+
+    assert storage.count() == 2
+    assert stored_values(storage) == {"alpha", "gamma"}
+    gamma_slot = storage.db.execute(
+        "SELECT slot FROM items WHERE value = 'gamma'"
+    ).fetchone()[0]
+    assert gamma_slot == beta_slot
+    assert [result["context"] for result in storage.search("gamma")] == ["gamma"]
+    assert storage.search("beta") == []
+    storage.close()
+
+
+def test_shrinking_max_items_keeps_most_recently_used_items(tmp_path):
+    storage = open_storage(tmp_path, max_items=4)
+    for text in ["alpha", "beta", "gamma"]:
+        storage.save(text, {})
+    storage.search("alpha")
+    storage.close()
+
+    storage = open_storage(tmp_path, max_items=2)
+
+    assert storage.count() == 2
+    assert stored_values(storage) == {"alpha", "gamma"}
+    assert os.path.getsize(tmp_path / f"vectors_{DIM}.f32") == 2 * DIM * 4
+    assert [result["context"] for result in storage.search("alpha")] == ["alpha"]
+    assert [result["context"] for result in storage.search("gamma")] == ["gamma"]
+    storage.close()
+
+
+def test_growing_max_items_keeps_all_items(tmp_path):
+    storage = open_storage(tmp_path, max_items=2)
+    storage.save("alpha", {})
+    storage.save("beta", {})
+    storage.close()
+
+    storage = open_storage(tmp_path, max_items=4)
+    storage.save("gamma", {})
+
+    assert stored_values(storage) == {"alpha", "beta", "gamma"}
+    assert os.path.getsize(tmp_path / f"vectors_{DIM}.f32") == 4 * DIM * 4
+    assert [result["context"] for result in storage.search("beta")] == ["beta"]
+    storage.close()
+
+
+def test_failed_flush_keeps_items_buffered(tmp_path):
+    calls = []
+
+    def flaky_embed(texts: list[str]) -> list[list[float]]:
+        calls.append(list(texts))
+        if len(calls) == 1:
+            raise RuntimeError("embedding service unavailable")
+        return fake_embed(texts)
+
+    storage = open_storage(tmp_path, max_items=4, batch_size=8, embed=flaky_embed)
+    storage.save("alpha", {})
+    storage.save("beta", {})
+
+    with pytest.raises(RuntimeError):
+        storage.flush()
+    assert len(storage.pending) == 2
+    assert storage.count() == 0
+
+    storage.flush()
+    assert storage.pending == []
+    assert stored_values(storage) == {"alpha", "beta"}
+    assert calls[1] == ["alpha", "beta"]
+    storage.close()
+
+
+def test_closed_storage_ignores_flush_and_search(tmp_path):
+    storage = open_storage(tmp_path, max_items=4, batch_size=8)
+    storage.save("alpha", {})
+    storage.close()
+
+    storage.flush()
+    assert storage.search("alpha") == []
+
+
+def test_backend_closes_idle_namespaces_and_deletes_old_ones(tmp_path):
+    backend = MemoryBackend(
+        embed=fake_embed,
+        root_dir=str(tmp_path),
+        max_items=4,
+        batch_size=1,
+        dim=DIM,
+        max_open_namespaces=1,
+        max_namespaces=2,
+    )
+    held = backend.get_memories("held")
+    for namespace in ["first", "second"]:
+        backend.get_memories(namespace)
+        backend.release_memories(namespace)
+
+    assert list(backend.memories) == ["held"]
+    assert not held.storages[0].closed
+    assert sorted(os.listdir(tmp_path)) == ["held", "second"]
+
+    backend.release_memories("held")
+    backend.close()
+    assert held.storages[0].closed
@@ -0,0 +1,162 @@
+#
+# Humanoid: A simple, natural language interface for orchestrating autonomous agents.
+# File: test_optimizer.py
+# Author: Aditya Patange (AdiPat)
+# License: MIT License
+#
+
+from humanoid.config import (
+    AgentConfig,
+    AgentReference,
+    CrewConfig,
+    CrewSettings,
+    TaskConfig,
+)
+from humanoid.optimizer import ConfigNormalizer, ConfigPolicy, normalize_crew_config
+
+
+def make_agent(agent_id: str, role: str = "Researcher", goal: str = "Find facts") -> AgentConfig:
+    return AgentConfig(
+        id=agent_id,
+        role=role,
+        goal=goal,
+        backstory="An experienced analyst.",
+        allow_delegation=False,
+        verbose=False,
+    )
+
+
+def make_task(agent_id: str, description: str = "Research the topic") -> TaskConfig:
+    return TaskConfig(
+        description=description,
+        expected_output="A short report",
+        tools=[],
+        agent=AgentReference(id=agent_id),
+    )
+
+
+def make_config(agents: list[AgentConfig], tasks: list[TaskConfig]) -> CrewConfig:
+    return CrewConfig(
+        crew=CrewSettings(verbose=False, memory=False),
+        agents=agents,
+        tasks=tasks,
+        input=[],
+    )
+
+
+def task_agent_ids(config: CrewConfig) -> list[str]:
+    return [task.agent.id for task in config.tasks]
+
+
+def test_identical_agents_are_merged():
+    config = make_config(
+        [make_agent("a1"), make_agent("a2", role=" researcher ")],
+        [make_task("a1", "First"), make_task("a2", "Second")],
+    )
+
+    normalized = normalize_crew_config(config)
+
+    assert [agent.id for agent in normalized.config.agents] == ["a1"]
+    assert task_agent_ids(normalized.config) == ["a1", "a1"]
+    assert any("Merged agent 'a2'" in issue for issue in normalized.issues)
+
+
+def test_merging_can_be_disabled():
+    config = make_config(
+        [make_agent("a1"), make_agent("a2")],
+        [make_task("a1", "First"), make_task("a2", "Second")],
+    )
+
+    normalized = normalize_crew_config(
+        config, ConfigPolicy(merge_duplicate_agents=False)
+    )
+
+    assert [agent.id for agent in normalized.config.agents] == ["a1", "a2"]
+    assert normalized.issues == []
+
+
+def test_agent_references_fall_back_to_id_and_role():
+    config = make_config(
+        [make_agent("researcher_1"), make_agent("writer_1", role="Writer", goal="Write")],
+        [
+            make_task("RESEARCHER_1", "First"),
+            make_task("writer", "Second"),
+            make_task("editor", "Third"),
+        ],
+    )
+
+    normalized = normalize_crew_config(config)
+
+    assert task_agent_ids(normalized.config) == ["researcher_1", "writer_1"]
+    assert any("unknown agent 'editor'" in issue for issue in normalized.issues)
+
+
+def test_single_agent_receives_unresolved_tasks():
+    config = make_config([make_agent("a1")], [make_task("someone_else")])
+
+    normalized = normalize_crew_config(config)
+
+    assert task_agent_ids(normalized.config) == ["a1"]
+
+
+def test_duplicate_tasks_are_dropped():
+    config = make_config(
+        [make_agent("a1")],
+        [make_task("a1", "Research the topic"), make_task("a1", "research  the TOPIC")],
+    )
+
+    normalized = normalize_crew_config(config)
+
+    assert len(normalized.config.tasks) == 1
+    assert any("duplicating an earlier task" in issue for issue in normalized.issues)
+
+
+def test_task_caps_are_applied():
+    agents = [make_agent("a1"), make_agent("a2", role="Writer", goal="Write")]
+    tasks = [make_task("a1", f"Research {i}") for i in range(3)]
+    tasks += [make_task("a2", f"Write {i}") for i in range(3)]
+
+    uncapped = normalize_crew_config(make_config(agents, tasks))
+    per_agent = normalize_crew_config(
+        make_config(agents, tasks), ConfigPolicy(max_tasks_per_agent=2)
+    )
+    per_crew = normalize_crew_config(
+        make_config(agents, tasks), ConfigPolicy(max_tasks=4)
+    )
+
+    assert len(uncapped.config.tasks) == 6
+    assert task_agent_ids(per_agent.config) == ["a1", "a1", "a2", "a2"]
+    assert task_agent_ids(per_crew.config) == ["a1", "a1", "a1", "a2"]
+
+
+def test_agents_without_tasks_are_dropped():
+    config = make_config(
+        [make_agent("a1"), make_agent("a2", role="Writer", goal="Write")],
+        [make_task("a1")],
+    )
+
+    normalized = normalize_crew_config(config)
+
+    assert [agent.id for agent in normalized.config.agents] == ["a1"]
+    assert "Dropped agent 'a2' with no tasks." in normalized.issues
+    assert normalized.estimate.agents == 1
+    assert normalized.estimate.tasks == 1
+
+
+def test_incremental_normalizer_matches_batch_normalization():
+    agents = [
+        make_agent("a1"),
+        make_agent("a2"),
+        make_agent("a3", role="Writer", goal="Write"),
+    ]
+    tasks = [make_task("a2", "First"), make_task("writer", "Second"), make_task("a1", "First")]
+    config = make_config(agents, tasks)
+
+    normalizer = ConfigNormalizer()
+    for agent in agents:
+        normalizer.add_agent(agent)
+    kept = [normalizer.add_task(task) for task in tasks]
+
+    assert [task.agent.id if task else None for task in kept] == ["a1", "a3", None]
+    assert normalizer.get_agent("a3") == agents[2]
+    assert normalizer.result(config) == normalize_crew_config(config)